@@ -0,0 +1,117 @@
+import math
+
+from concurrent.futures import ThreadPoolExecutor
+
+from geometry import ScreenWrapOffsets, collision_test_with_screen_wraps
+
+# the grid cells should not be smaller than this, otherwise objects are inserted into too many cells
+min_cell_size = 32
+
+# below this number of candidate pairs, the narrow phase is not worth distributing to the workers
+min_pairs_per_worker = 32
+
+class CollisionGrid:
+    'A uniform grid over the (wrapping) screen to find pairs of objects that might collide'
+
+    def __init__(self, screen_width, screen_height, cell_size):
+        # the screen is divided into a whole number of cells, so that objects wrapping around the
+        # screen edges end up in the same cells as their copies on the other side
+        self.num_cells_x = max(1, int(screen_width // cell_size))
+        self.num_cells_y = max(1, int(screen_height // cell_size))
+        self.cell_width = screen_width / self.num_cells_x
+        self.cell_height = screen_height / self.num_cells_y
+        self.cells = {}
+
+    def get_cell_range(self, min_coord, max_coord, cell_size, num_cells):
+        first = math.floor(min_coord / cell_size)
+        last = math.floor(max_coord / cell_size)
+        if last - first + 1 >= num_cells:
+            return range(0, num_cells)
+        return [ c % num_cells for c in range(first, last + 1) ]
+
+    def get_cells(self, p):
+        aabb = p.get_aabb()
+        x_range = self.get_cell_range(aabb[0], aabb[2], self.cell_width, self.num_cells_x)
+        y_range = self.get_cell_range(aabb[1], aabb[3], self.cell_height, self.num_cells_y)
+        return [ (x, y) for x in x_range for y in y_range ]
+
+    def insert(self, index, p):
+        for cell in self.get_cells(p):
+            self.cells.setdefault(cell, []).append(index)
+
+    def query(self, p):
+        candidates = set()
+        for cell in self.get_cells(p):
+            candidates.update(self.cells.get(cell, []))
+        return candidates
+
+class CollisionDetector:
+    'Finds colliding pairs of objects using a grid and an optional pool of worker threads for the narrow phase'
+
+    def __init__(self, screen_width, screen_height, num_workers=0):
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.wrap_offsets = ScreenWrapOffsets(screen_width, screen_height)
+        self.num_workers = num_workers
+        self.pool = None
+        if num_workers > 1:
+            self.pool = ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="collision")
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def get_candidate_pairs(self, objects_a, objects_b):
+        # objects_b is None: test the objects in objects_a against each other
+        self_test = objects_b is None
+        if self_test:
+            objects_b = objects_a
+
+        if not objects_a or not objects_b:
+            return []
+
+        # cells should be at least as large as the largest object, so each object covers only a few cells
+        cell_size = min_cell_size
+        for p in (objects_a if self_test else objects_a + objects_b):
+            aabb = p.get_aabb()
+            cell_size = max(cell_size, aabb[2] - aabb[0], aabb[3] - aabb[1])
+
+        grid = CollisionGrid(self.screen_width, self.screen_height, cell_size)
+        for j, b in enumerate(objects_b):
+            grid.insert(j, b)
+
+        pairs = []
+        for i, a in enumerate(objects_a):
+            for j in grid.query(a):
+                if not self_test or j > i:
+                    pairs.append((i, j))
+
+        # sort the pairs so the results are in the same order as in a nested loop over both lists
+        pairs.sort()
+        return pairs
+
+    def test_pairs(self, pairs, objects_a, objects_b):
+        return [ collision_test_with_screen_wraps(objects_a[i], objects_b[j], self.wrap_offsets) for i, j in pairs ]
+
+    # returns the sorted list of index pairs (i, j) for which objects_a[i] collides with objects_b[j],
+    # or objects_a[i] collides with objects_a[j] and i < j if objects_b is not given
+    def find_collisions(self, objects_a, objects_b=None):
+        # the bounding boxes (and transformed vertices) are cached by get_candidate_pairs,
+        # afterwards the collision tests do not change any object and can run in parallel
+        pairs = self.get_candidate_pairs(objects_a, objects_b)
+        if objects_b is None:
+            objects_b = objects_a
+
+        if self.pool is None or len(pairs) < 2 * min_pairs_per_worker:
+            results = self.test_pairs(pairs, objects_a, objects_b)
+        else:
+            num_chunks = min(self.num_workers, len(pairs) // min_pairs_per_worker)
+            chunk_size = -(-len(pairs) // num_chunks)
+            chunks = [ pairs[k:k + chunk_size] for k in range(0, len(pairs), chunk_size) ]
+            results = []
+            # map returns the results in the order of the chunks, so they are merged deterministically
+            for chunk_results in self.pool.map(lambda chunk: self.test_pairs(chunk, objects_a, objects_b), chunks):
+                results.extend(chunk_results)
+
+        return [ pair for pair, collide in zip(pairs, results) if collide ]
@@ -0,0 +1,88 @@
+import pygame
+
+# actions as bits of the action mask of a tick
+ACTION_LEFT = 1
+ACTION_RIGHT = 2
+ACTION_THRUST = 4
+ACTION_FIRE = 8  # fire or request a new ship, each press is queued in fire_requests
+ACTION_PAUSE = 16
+ACTION_TOGGLE_FPS = 32
+ACTION_QUIT = 64
+
+# keys which trigger an action as long as they are held down
+held_key_bindings = {
+        pygame.K_LEFT: ACTION_LEFT,
+        pygame.K_RIGHT: ACTION_RIGHT,
+        pygame.K_UP: ACTION_THRUST,
+        }
+
+# keys which trigger an action when they are pressed
+pressed_key_bindings = {
+        pygame.K_SPACE: ACTION_FIRE,
+        pygame.K_ESCAPE: ACTION_PAUSE,
+        pygame.K_f: ACTION_TOGGLE_FPS,
+        }
+
+class InputState:
+    'The input of one tick: a mask of actions and the times (in ms) at which fire was pressed'
+
+    def __init__(self, actions=0, fire_requests=None, time=0):
+        self.actions = actions
+        self.fire_requests = fire_requests if fire_requests is not None else []
+        # the time at which the input was sampled, fire requests are at or before this time
+        self.time = time
+
+        # the fire bit and the fire requests are kept consistent, so inputs can be given either way: a mask
+        # with the fire bit set and no requests fires once at the time of the input
+        if self.fire_requests:
+            self.actions |= ACTION_FIRE
+        elif self.actions & ACTION_FIRE:
+            self.fire_requests = [time]
+
+    def is_active(self, action):
+        return (self.actions & action) != 0
+
+    # compact representation for recording and replaying input
+    def to_tuple(self):
+        return (self.actions, list(self.fire_requests), self.time)
+
+    @staticmethod
+    def from_tuple(values):
+        return InputState(values[0], list(values[1]), values[2])
+
+class KeyboardInput:
+    'Samples the keyboard (and window events) once per tick'
+
+    def __init__(self, held_bindings=held_key_bindings, pressed_bindings=pressed_key_bindings):
+        self.held_bindings = held_bindings
+        self.pressed_bindings = pressed_bindings
+        self.last_sample_time = pygame.time.get_ticks()
+
+    def sample(self):
+        now = pygame.time.get_ticks()
+        actions = 0
+        num_fire_requests = 0
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                actions |= ACTION_QUIT
+            elif event.type == pygame.KEYDOWN and event.key in self.pressed_bindings:
+                action = self.pressed_bindings[event.key]
+                # pause and fps toggle are flipped for every press
+                if action & (ACTION_PAUSE | ACTION_TOGGLE_FPS):
+                    actions ^= action
+                else:
+                    actions |= action
+                if action == ACTION_FIRE:
+                    num_fire_requests += 1
+
+        pressed = pygame.key.get_pressed()
+        for key, action in self.held_bindings.items():
+            if pressed[key]:
+                actions |= action
+
+        # pygame does not tell when a key was pressed, so the presses are spread evenly over the time since the last tick
+        fire_requests = [ self.last_sample_time + (now - self.last_sample_time) * (i + 1) / num_fire_requests for i in range(0, num_fire_requests) ]
+        self.last_sample_time = now
+
+        return InputState(actions, fire_requests, now)
@@ -0,0 +1,93 @@
+import pygame
+
+# Game events which are published by the world (see world.py). Handlers are subscribed per event type.
+# The world only creates an event if somebody subscribed to its type, so without subscribers the events
+# cost (almost) nothing. Positions are copies, i.e., they do not change when the objects move on.
+
+class AsteroidDestroyed:
+    'An asteroid was destroyed (by a shot, the spaceship, or another asteroid)'
+    __slots__ = ('frame', 'position', 'radius', 'split')
+    name = "asteroid_destroyed"
+
+    def __init__(self, frame, position, radius, split):
+        self.frame = frame
+        self.position = pygame.math.Vector2(position)
+        self.radius = radius
+        # True if the asteroid splits up into two smaller ones
+        self.split = split
+
+class ShotFired:
+    'The spaceship fired a laser shot'
+    __slots__ = ('frame', 'position', 'angle')
+    name = "shot_fired"
+
+    def __init__(self, frame, position, angle):
+        self.frame = frame
+        self.position = pygame.math.Vector2(position)
+        self.angle = angle
+
+class ShipLost:
+    'The spaceship was destroyed by an asteroid'
+    __slots__ = ('frame', 'position', 'lifes', 'game_over')
+    name = "ship_lost"
+
+    def __init__(self, frame, position, lifes, game_over):
+        self.frame = frame
+        self.position = pygame.math.Vector2(position)
+        # remaining ships
+        self.lifes = lifes
+        self.game_over = game_over
+
+class LevelStarted:
+    'A new level was started and its asteroids were spawned'
+    __slots__ = ('frame', 'level', 'num_asteroids')
+    name = "level_started"
+
+    def __init__(self, frame, level, num_asteroids):
+        self.frame = frame
+        self.level = level
+        self.num_asteroids = num_asteroids
+
+class FrameFinished:
+    'The world was updated, contains the time (in seconds) spent in each phase of the update'
+    __slots__ = ('frame', 'phase_times', 'num_objects', 'points', 'level', 'lifes')
+    name = "frame_finished"
+
+    def __init__(self, frame, phase_times, num_objects, points, level, lifes):
+        self.frame = frame
+        # list of (phase name, seconds)
+        self.phase_times = phase_times
+        self.num_objects = num_objects
+        self.points = points
+        self.level = level
+        self.lifes = lifes
+
+game_event_types = [AsteroidDestroyed, ShotFired, ShipLost, LevelStarted]
+
+class EventBus:
+    'Calls the handlers subscribed to the type of an event when it is published'
+
+    def __init__(self):
+        # event type -> list of handlers, types without handlers are removed
+        self.handlers = {}
+
+    def subscribe(self, event_type, handler):
+        self.handlers.setdefault(event_type, []).append(handler)
+
+    def unsubscribe(self, event_type, handler):
+        handlers = self.handlers.get(event_type)
+        if handlers is not None and handler in handlers:
+            handlers.remove(handler)
+            if not handlers:
+                del self.handlers[event_type]
+
+    # publishers check this before creating an event, so nothing is created if nobody listens
+    def has_subscribers(self, event_type):
+        return event_type in self.handlers
+
+    def publish(self, event):
+        handlers = self.handlers.get(type(event))
+        if handlers:
+            # handlers may unsubscribe while being called
+            for handler in tuple(handlers):
+                handler(event)
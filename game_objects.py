@@ -0,0 +1,250 @@
+import pygame
+import random
+
+from geometry import Polygon2D, flatten_vertices, get_screen_wrap_modifiers
+
+# the vertices of objects with a fixed shape are shared by all objects of a class
+spaceship_vertices = flatten_vertices([ pygame.math.Vector2(10, 5), pygame.math.Vector2(0, -20), pygame.math.Vector2(-10, 5) ])
+laser_shot_vertices = flatten_vertices([ pygame.math.Vector2(-1.5,0), pygame.math.Vector2(1.5,0), pygame.math.Vector2(0, -7) ])
+debris_vertices = flatten_vertices([ pygame.math.Vector2(1,1), pygame.math.Vector2(0,-1), pygame.math.Vector2(-1,1) ])
+
+# classes for game objects, they use __slots__ to keep the memory footprint small for large numbers of objects
+class GameObject(Polygon2D):
+    __slots__ = ('speed', 'direction', 'is_destroyed', 'color', 'screen_wrap_modifiers')
+
+    def __init__(self, vertices, color):
+        Polygon2D.__init__(self, vertices)
+        self.speed = 0
+        self.direction = pygame.math.Vector2(0,0)
+        self.is_destroyed = False
+        self.color = color
+        self.screen_wrap_modifiers = ()
+
+    def get_speed(self):
+        return self.speed
+
+    def set_speed(self, speed):
+        self.speed = speed
+
+    def change_speed(self, delta):
+        self.speed = self.speed + delta
+
+    def get_direction(self):
+        return self.direction
+
+    def set_direction(self, direction):
+        self.direction = direction
+
+    def set_destroyed(self):
+        self.is_destroyed = True
+
+    def destroyed(self):
+        return self.is_destroyed
+
+    def get_color(self):
+        return self.color
+
+    def set_color(self, color):
+        self.color = color
+
+    def move(self, speed_factor):
+        self.translate(speed_factor * self.speed * self.get_direction())
+
+    def screen_wrap(self, screen_width, screen_height):
+        # move the translation vector within the screen bounds
+        if self.translation[0] < 0:
+            self.translate(pygame.math.Vector2(screen_width, 0))
+
+        if self.translation[1] < 0:
+            self.translate(pygame.math.Vector2(0, screen_height))
+
+        if self.translation[0] >= screen_width:
+            self.translate(pygame.math.Vector2(-screen_width, 0))
+
+        if self.translation[1] >= screen_height:
+            self.translate(pygame.math.Vector2(0, -screen_height))
+
+        self.screen_wrap_modifiers = get_screen_wrap_modifiers(self, screen_width, screen_height)
+
+    def render_with_screen_wraps(self, surface):
+        # first of all: render at the standard position
+        self.render(surface, self.color)
+
+        # get transformed vertices
+        points = self.get_transformed_points()
+
+        # now get the screen wrap modifiers
+        wrap_modifiers = self.screen_wrap_modifiers
+
+        for m_x, m_y in wrap_modifiers:
+            current_points = [(x + m_x, y + m_y) for x, y in points]
+            pygame.draw.polygon(surface, self.color, current_points, 1)
+
+class Spaceship(GameObject):
+    __slots__ = ()
+
+    def __init__(self, color):
+        super(Spaceship,self).__init__(spaceship_vertices, color)
+
+    def add_thrust(self, amount):
+        thrust = amount * pygame.math.Vector2(0, -1).rotate(self.rotation_angle)
+        momentum = self.speed * self.direction + thrust
+
+        # speed is capped at 15
+        self.speed = min(momentum.length(), 15)
+        self.direction = momentum.normalize()
+
+    def get_tip_position(self):
+        return self.get_vertex(1).rotate(self.rotation_angle) + self.translation
+
+class LaserShot(GameObject):
+    __slots__ = ('traveled_distance', 'max_travel_dist')
+
+    shot_color_begin = pygame.math.Vector3(255, 50, 50)
+    shot_color_end = pygame.math.Vector3(255, 255, 50)
+
+    def __init__(self, position, direction, rotation_angle, max_travel_dist):
+        super(LaserShot,self).__init__(laser_shot_vertices, [ int(self.shot_color_begin.x), int(self.shot_color_begin.y), int(self.shot_color_begin.z) ] )
+        self.rotation_angle = rotation_angle
+        self.translation = position
+        self.direction = direction
+        self.traveled_distance = 0
+        self.max_travel_dist = max_travel_dist
+
+    def get_traveled_distance(self):
+        return self.traveled_distance
+
+    def move(self, speed_factor):
+        super(LaserShot, self).move(speed_factor)
+        self.traveled_distance = self.traveled_distance + (speed_factor * self.speed * self.get_direction()).length()
+        if self.max_travel_dist > 0:
+            factor = min(1, self.traveled_distance / self.max_travel_dist)
+            current_color = self.shot_color_begin.lerp(self.shot_color_end, factor)
+            self.color = [ int(current_color.x), int(current_color.y), int(current_color.z) ]
+            if self.traveled_distance > self.max_travel_dist:
+                self.is_destroyed = True
+
+class Asteroid(GameObject):
+    __slots__ = ('spin', 'destruction_vector', 'destruction_speed', 'radius')
+
+    def __init__(self, radius, num_vertices, color):
+        assert(num_vertices > 2), "asteroid must have >2 vertices"
+        
+        self.radius = radius
+        # we randomy generate asteroids by choosing points on a perturbed circle
+        vertices = []
+        mean_angle = 360 / num_vertices
+        mean_radius = radius
+
+        angle_variation = 0.2 * mean_angle
+        radius_variation = 0.3 * mean_radius
+
+        current_angle = 0
+        for i in range(0, num_vertices):
+            current_radius = mean_radius + random.uniform(-radius_variation, radius_variation) 
+            current_vector = pygame.math.Vector2(0, current_radius)
+
+            current_angle = current_angle + random.uniform(-angle_variation, angle_variation)
+            current_vector.rotate_ip(current_angle)
+            vertices.append(current_vector)
+
+            current_angle = current_angle + mean_angle
+
+        super(Asteroid,self).__init__(vertices, color)
+        self.destruction_vector = pygame.math.Vector2(0,0)
+        self.destruction_speed = 0
+
+        # now randomly generate the direction
+        self.direction = pygame.math.Vector2(0, 1)
+        self.direction.rotate_ip(random.uniform(0, 360))
+        self.direction.normalize_ip()
+
+        # now randomly generate the speed
+        min_speed = 0.01 
+        max_speed = 1
+        self.speed = random.uniform(min_speed, max_speed)
+
+        # now randomly generate the spin
+        max_spin = 1
+        self.spin = random.uniform(-max_spin, max_spin)
+
+    def get_radius(self):
+        return self.radius
+
+    def set_spin(self, spin):
+        self.spin = spin
+
+    def get_spin(self):
+        return spin
+
+    def change_spin(self, delta):
+        self.spin = self.spin.delta
+
+    def move(self, speed_factor):
+        super(Asteroid,self).move(speed_factor)
+        self.rotation_angle += self.spin * speed_factor
+
+    def set_destruction_vector(self, v):
+        self.destruction_vector = v
+
+    def get_destruction_vector(self):
+        return self.destruction_vector
+
+    def set_destruction_speed(self, speed):
+        self.destruction_speed = speed
+
+    def get_destruction_speed(self):
+        return self.destruction_speed
+
+class Debris(GameObject):
+    __slots__ = ('spin', 'life_time', 'max_life', 'original_color')
+
+    fade_to_color = [0, 0, 0]
+
+    def __init__(self, position, color):
+        super(Debris,self).__init__(debris_vertices, color)
+        self.life_time = 0
+        # now randomly generate the direction
+        self.direction = pygame.math.Vector2(0, 1)
+        self.direction.rotate_ip(random.uniform(0, 360))
+        self.direction.normalize_ip()
+
+        # now randomly generate the speed
+        min_speed = 0.1 
+        max_speed = 1.5
+        self.speed = random.uniform(min_speed, max_speed)
+
+        # now randomly generate the spin
+        max_spin = 2
+        self.spin = random.uniform(-max_spin, max_spin)
+
+        # now randomly generate the life time, 60 corresponds to one second
+        self.max_life = random.uniform(100, 200)
+
+        self.translation = position
+
+        self.original_color = color
+
+    def set_spin(self, spin):
+        self.spin = spin
+
+    def get_spin(self):
+        return spin
+
+    def change_spin(self, delta):
+        self.spin = self.spin.delta
+
+    def move(self, speed_factor):
+        super(Debris,self).move(speed_factor)
+        self.rotation_angle += self.spin * speed_factor
+        self.add_to_life_time(speed_factor)
+
+    def add_to_life_time(self, time):
+        self.life_time = self.life_time + time
+        if self.life_time > self.max_life:
+            self.is_destroyed = True
+        factor = min(1, self.life_time / self.max_life)
+        current_color = []
+        for i in range(0, 3):
+            current_color.append(int(max(0,min(255,(1-factor) * self.original_color[i] + factor * self.fade_to_color[i]))))
+        self.color = current_color
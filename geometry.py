@@ -0,0 +1,291 @@
+import math
+import pygame
+
+from array import array
+
+# converts a list of points (e.g., pygame.math.Vector2) into a flat array of coordinates x0, y0, x1, y1, ...
+def flatten_vertices(vertices):
+    coords = array('d')
+    for v in vertices:
+        coords.append(v[0])
+        coords.append(v[1])
+    return coords
+
+# classes for geometric objects (polygons, etc.)
+class Polygon2D:
+    'A simple class for 2D polygons, the vertices are stored as flat arrays of coordinates (x0, y0, x1, y1, ...)'
+    __slots__ = ('vertices', 'rotation_angle', 'translation', 'transformation_valid', 'aabb', 'transformed_vertices')
+
+    def __init__(self, vertices):
+        # vertices are either a list of points or an array of coordinates, which is used without copying it
+        if not isinstance(vertices, array):
+            vertices = flatten_vertices(vertices)
+
+        # in order to define a polygon, we need at least 3 vertices
+        assert(len(vertices) >= 6), "Not enough vertices in polygon"
+
+        self.vertices = vertices
+        self.rotation_angle = 0
+        self.translation = pygame.math.Vector2(0)
+
+        # transformed vertices and bounding box (min. x, min. y, max. x, max. y) are updated when needed
+        self.transformation_valid = False
+        self.transformed_vertices = array('d', self.vertices)
+        self.aabb = array('d', [0, 0, 0, 0])
+
+    def get_num_vertices(self):
+        return len(self.vertices) // 2
+
+    def get_vertex(self, index):
+        return pygame.math.Vector2(self.vertices[2 * index], self.vertices[2 * index + 1])
+
+    def get_rotation_angle(self):
+        return self.rotation_angle
+
+    def get_translation(self):
+        return self.translation
+
+    def invalidate_transformation(self):
+        self.transformation_valid = False
+
+    def set_rotation_angle(self, angle):
+        self.rotation_angle = angle
+        self.invalidate_transformation()
+
+    def set_translation(self, translation):
+        self.translation = translation
+        self.invalidate_transformation()
+
+    def rotate(self, angle):
+        self.rotation_angle = (self.rotation_angle + angle) % 360.0
+        self.invalidate_transformation()
+
+    def translate(self, offset):
+        self.translation += offset
+        self.invalidate_transformation()
+
+    def update_transformation(self):
+        # rotating (1, 0) gives cosine and sine of the angle exactly as pygame.math.Vector2.rotate() uses them,
+        # so the results are the same as rotating every vertex with pygame
+        cos_angle, sin_angle = pygame.math.Vector2(1, 0).rotate(self.rotation_angle)
+        t_x, t_y = self.translation
+
+        vertices = self.vertices
+        transformed_vertices = self.transformed_vertices
+        min_x = min_y = math.inf
+        max_x = max_y = -math.inf
+        for i in range(0, len(vertices), 2):
+            x = vertices[i]
+            y = vertices[i + 1]
+            transformed_x = cos_angle * x - sin_angle * y + t_x
+            transformed_y = sin_angle * x + cos_angle * y + t_y
+            transformed_vertices[i] = transformed_x
+            transformed_vertices[i + 1] = transformed_y
+
+            min_x = min(min_x, transformed_x)
+            min_y = min(min_y, transformed_y)
+            max_x = max(max_x, transformed_x)
+            max_y = max(max_y, transformed_y)
+
+        aabb = self.aabb
+        aabb[0] = min_x
+        aabb[1] = min_y
+        aabb[2] = max_x
+        aabb[3] = max_y
+        self.transformation_valid = True
+
+    def get_transformed_vertices(self):
+        if not self.transformation_valid:
+            self.update_transformation()
+
+        return self.transformed_vertices
+
+    # transformed vertices as list of (x, y) tuples, e.g., for drawing
+    def get_transformed_points(self):
+        transformed_vertices = self.get_transformed_vertices()
+        return list(zip(transformed_vertices[0::2], transformed_vertices[1::2]))
+
+    def render(self, surface, color):
+        pygame.draw.polygon(surface, color, self.get_transformed_points(), 1)
+
+    def get_aabb(self):
+        if not self.transformation_valid:
+            self.update_transformation()
+
+        return self.aabb
+
+
+    # TODO: convexity test?
+    # TODO: self-intersection test?
+    # TODO: triangulation
+
+# --------------------
+# geometric predicates
+# --------------------
+
+# orientation test for three points a, b, c, >0: left turn, ==0: collinear, <0: right turn
+def orientation_test(a_x, a_y, b_x, b_y, c_x, c_y):
+    acx = a_x - c_x
+    bcx = b_x - c_x
+    acy = a_y - c_y
+    bcy = b_y - c_y
+
+    return acx * bcy - acy * bcx
+
+# line intersection test, line segments are defined by p0-p1 and p2-p3
+def lines_intersect(x0, y0, x1, y1, x2, y2, x3, y3):
+    # compare bounding boxes first
+    return ((max(x0, x1) >= min(x2, x3)) and (max(x2, x3) >= min(x0, x1)) and (max(y0, y1) >= min(y2, y3)) and (max(y2, y3) >= min(y0, y1))
+            and (orientation_test(x0, y0, x2, y2, x3, y3) * orientation_test(x1, y1, x2, y2, x3, y3) <= 0)
+            and (orientation_test(x2, y2, x0, y0, x1, y1) * orientation_test(x3, y3, x0, y0, x1, y1) <= 0))
+
+
+# checks if a point (x, y) is inside a polygon p given by its vertices in correct (CCW) order.
+# the algorithm uses the ray crossing method described in "Computational Geometry in C"
+def point_in_poly(x, y, p):
+    return point_in_vertices(x, y, p.get_transformed_vertices())
+
+def point_in_vertices(x, y, p_vertices):
+    c = False
+
+    first_x = p_vertices[-2]
+    first_y = p_vertices[-1]
+    for i in range(0, len(p_vertices), 2):
+        second_x = p_vertices[i]
+        second_y = p_vertices[i + 1]
+        if ((second_y > y) != (first_y > y)) and (x < (first_x - second_x) * (y - second_y) / (first_y - second_y) + second_x):
+            c = not c
+        first_x = second_x
+        first_y = second_y
+    
+    return c
+
+# checks if there is a collision (i.e., intersection) between two polygons a and b,
+# polygon a is displaced by the (optional) offset (x, y) without changing the object itself
+# TODO: this method might be quite slow (quadratic in runtime), make it more efficient
+def collision_test(a, b, offset=None):
+    a_vertices = a.get_transformed_vertices()
+    b_vertices = b.get_transformed_vertices()
+
+    a_aabb = a.get_aabb()
+    b_aabb = b.get_aabb()
+    if offset is not None:
+        offset_x, offset_y = offset
+        a_aabb = (a_aabb[0] + offset_x, a_aabb[1] + offset_y, a_aabb[2] + offset_x, a_aabb[3] + offset_y)
+
+    # speed up the computation by checking if bounding boxes overlap
+    if not ((a_aabb[2] >= b_aabb[0]) and (b_aabb[2] >= a_aabb[0]) and (a_aabb[3] >= b_aabb[1]) and (b_aabb[3] >= a_aabb[1])):
+        return False
+
+    if offset is not None:
+        a_vertices = array('d', a_vertices)
+        for i in range(0, len(a_vertices), 2):
+            a_vertices[i] += offset_x
+            a_vertices[i + 1] += offset_y
+
+    # check if vertices of one polygon are inside of the other one
+    for i in range(0, len(a_vertices), 2):
+        if point_in_vertices(a_vertices[i], a_vertices[i + 1], b_vertices):
+            return True
+    for i in range(0, len(b_vertices), 2):
+        if point_in_vertices(b_vertices[i], b_vertices[i + 1], a_vertices):
+            return True
+
+    # check if any edges intersect
+    for a_index in range(0, len(a_vertices), 2):
+        for b_index in range(0, len(b_vertices), 2):
+            if lines_intersect(a_vertices[a_index - 2], a_vertices[a_index - 1], a_vertices[a_index], a_vertices[a_index + 1],
+                    b_vertices[b_index - 2], b_vertices[b_index - 1], b_vertices[b_index], b_vertices[b_index + 1]):
+                return True
+
+    return False
+
+# ------------------------------
+# screen wraps (toroidal world)
+# ------------------------------
+
+def check_screen_wraps(object, screen_width, screen_height):
+    aabb = object.get_aabb()
+    wraps = [False, False, False, False]
+
+    if aabb[0] < 0:
+        wraps[0] = True
+
+    if aabb[2] >= screen_width:
+        wraps[1] = True
+
+    if aabb[1] < 0:
+        wraps[2] = True
+
+    if aabb[3] >= screen_height:
+        wraps[3] = True
+
+    return wraps
+
+# returns the displacements (x, y) of the copies of p that need to be drawn because p wraps around the screen
+def get_screen_wrap_modifiers(p, screen_width, screen_height):
+    wraps = check_screen_wraps(p, screen_width, screen_height)
+
+    modifier_list = [ (0, 0), (0, 0), (0, 0) ]
+
+    if wraps[0]:
+        modifier_list[0] = (screen_width, 0)
+    elif wraps[1]:
+        modifier_list[0] = (-screen_width, 0)
+    
+    if wraps[2]:
+        modifier_list[1] = (0, screen_height)
+    elif wraps[3]:
+        modifier_list[1] = (0, -screen_height)
+
+    if wraps[0] and wraps[2]:
+        modifier_list[2] = (screen_width, screen_height)
+    elif wraps[0] and wraps[3]:
+        modifier_list[2] = (screen_width, -screen_height)
+    elif wraps[1] and wraps[2]:
+        modifier_list[2] = (-screen_width, screen_height)
+    elif wraps[1] and wraps[3]:
+        modifier_list[2] = (-screen_width, -screen_height)
+
+    # most objects do not wrap, they all share the same empty tuple
+    return tuple(m for m in modifier_list if m != (0, 0))
+
+# range of all k for which the interval [a_min, a_max] displaced by k * size overlaps [b_min, b_max]
+def get_wrap_range(a_min, a_max, b_min, b_max, size):
+    return range(math.ceil((b_min - a_max) / size), math.floor((b_max - a_min) / size) + 1)
+
+class ScreenWrapOffsets:
+    'Displacements (x, y) between the copies of the screen, they are created once and reused for all collision tests'
+
+    def __init__(self, screen_width, screen_height):
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.offsets = {}
+
+    def get_offset(self, k_x, k_y):
+        offset = self.offsets.get((k_x, k_y))
+        if offset is None:
+            offset = self.offsets.setdefault((k_x, k_y), (float(k_x * self.screen_width), float(k_y * self.screen_height)))
+        return offset
+
+# collision test for objects which might wrap around the screen edges. object a is tested at all positions
+# (displaced by multiples of the screen size) at which its bounding box overlaps the bounding box of b.
+# usually, this is only the copy closest to b, further copies are only tested if the objects are at
+# different edges of the screen. the objects are not changed, so this can be used for several pairs of
+# objects at the same time (see collision.py)
+def collision_test_with_screen_wraps(a, b, wrap_offsets):
+    a_aabb = a.get_aabb()
+    b_aabb = b.get_aabb()
+
+    x_range = get_wrap_range(a_aabb[0], a_aabb[2], b_aabb[0], b_aabb[2], wrap_offsets.screen_width)
+    y_range = get_wrap_range(a_aabb[1], a_aabb[3], b_aabb[1], b_aabb[3], wrap_offsets.screen_height)
+    for k_x in x_range:
+        for k_y in y_range:
+            if k_x == 0 and k_y == 0:
+                collide = collision_test(a, b)
+            else:
+                collide = collision_test(a, b, wrap_offsets.get_offset(k_x, k_y))
+            if collide:
+                return True
+
+    return False
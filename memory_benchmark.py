@@ -0,0 +1,137 @@
+import argparse
+import gc
+import os
+import random
+import tracemalloc
+
+# the game objects do not need a window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from game_objects import Spaceship, LaserShot, Asteroid, Debris
+
+# Reports how many bytes each kind of game object needs, including its vertices, bounding box and
+# screen wrap offsets after it has been moved once (i.e., with all caches filled). For comparison, the
+# same objects are also measured in the previous layout (see ReferenceObject).
+#
+#   python3 memory_benchmark.py [--count N]
+
+screen_width, screen_height = 1024, 768
+
+def create_asteroid():
+    return Asteroid(50, 11, [200, 200, 200])
+
+def create_small_asteroid():
+    return Asteroid(12, 5, [200, 200, 200])
+
+def create_debris():
+    return Debris(pygame.math.Vector2(random.uniform(0, screen_width), random.uniform(0, screen_height)), [180, 180, 180])
+
+def create_shot():
+    return LaserShot(pygame.math.Vector2(random.uniform(0, screen_width), random.uniform(0, screen_height)),
+            pygame.math.Vector2(0, -1), random.uniform(0, 360), 620)
+
+def create_spaceship():
+    return Spaceship([50, 255, 50])
+
+# ----------------------------------------------------------------------
+# reference: the previous layout of the game objects, before flat arrays
+# ----------------------------------------------------------------------
+
+class ReferenceObject:
+    'The state of a game object in the previous layout: an instance dictionary and lists of pygame vectors'
+
+    def __init__(self, p):
+        vector = pygame.math.Vector2
+        # every object had its own list of vertices, also the spaceship, laser shots, and debris
+        self.vertices = [ vector(p.vertices[i], p.vertices[i + 1]) for i in range(0, len(p.vertices), 2) ]
+        self.color = list(p.color)
+        self.rotation_angle = p.rotation_angle
+        self.translation = vector(p.translation)
+        self.speed = p.speed
+        # the spaceship used the direction of the class until it was accelerated
+        if not isinstance(p, Spaceship):
+            self.direction = vector(p.direction)
+        self.transformed_vertices = [ vector(x, y) for x, y in p.get_transformed_points() ]
+        self.transformed_vertices_valid = True
+        aabb = p.get_aabb()
+        self.aabb = [ vector(aabb[0], aabb[1]), vector(aabb[2], aabb[3]) ]
+        self.aabb_valid = True
+        self.screen_wrap_modifiers = [ vector(m) for m in p.screen_wrap_modifiers ]
+
+# the subclasses had their own attributes, and instances of one class share the keys of their dictionaries
+class ReferenceSpaceship(ReferenceObject):
+    pass
+
+class ReferenceLaserShot(ReferenceObject):
+
+    def __init__(self, p):
+        super().__init__(p)
+        self.traveled_distance = p.traveled_distance
+        self.max_travel_dist = p.max_travel_dist
+
+class ReferenceAsteroid(ReferenceObject):
+
+    def __init__(self, p):
+        super().__init__(p)
+        self.radius = p.radius
+        self.spin = p.spin
+
+class ReferenceDebris(ReferenceObject):
+
+    def __init__(self, p):
+        super().__init__(p)
+        self.spin = p.spin
+        self.max_life = p.max_life
+        self.life_time = p.life_time
+        self.original_color = list(p.original_color)
+
+def create_reference(p):
+    for object_class, reference_class in [(Asteroid, ReferenceAsteroid), (Debris, ReferenceDebris),
+            (LaserShot, ReferenceLaserShot), (Spaceship, ReferenceSpaceship)]:
+        if isinstance(p, object_class):
+            return reference_class(p)
+
+entity_kinds = [
+    ("Asteroid (11 vertices)", create_asteroid),
+    ("Asteroid (5 vertices)", create_small_asteroid),
+    ("Debris", create_debris),
+    ("LaserShot", create_shot),
+    ("Spaceship", create_spaceship),
+]
+
+def measure(create, count, reference=False):
+    random.seed(0)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    objects = []
+    for i in range(0, count):
+        p = create()
+        p.set_translation(pygame.math.Vector2(random.uniform(0, screen_width), random.uniform(0, screen_height)))
+        p.set_speed(1)
+        p.move(1)
+        p.screen_wrap(screen_width, screen_height)
+        p.get_aabb()
+        objects.append(create_reference(p) if reference else p)
+
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / count
+
+def main():
+    parser = argparse.ArgumentParser(description="Reports the memory used per game object")
+    parser.add_argument("--count", type=int, default=10000, help="number of objects to create of each kind")
+    args = parser.parse_args()
+
+    print("{0:<24} {1:>14} {2:>14} {3:>8}".format("entity", "before (bytes)", "after (bytes)", "saved"))
+    for name, create in entity_kinds:
+        before = measure(create, args.count, reference=True)
+        after = measure(create, args.count)
+        print("{0:<24} {1:>14.0f} {2:>14.0f} {3:>7.0f}%".format(name, before, after, 100 * (1 - after / before)))
+
+if __name__ == "__main__":
+    main()
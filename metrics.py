@@ -0,0 +1,212 @@
+import json
+import os
+import time
+
+from events import game_event_types, FrameFinished
+
+# The metrics exporter subscribes to the game events of a world (see events.py) and aggregates them:
+# the number of events (in total and per second), and the time spent in each phase of a frame (mean and
+# maximum per interval). Phases are the phases of World.update() plus the ones reported with
+# record_phase(), e.g., rendering. Once per interval, the metrics are written to a local file:
+#
+#   prometheus: the file is replaced by the current metrics in the Prometheus text format, so it can be
+#               picked up by the textfile collector of the node exporter
+#   jsonl:      one JSON object is appended per interval, so load spikes can be matched with the game
+#               events of the same interval afterwards
+
+metrics_formats = ["prometheus", "jsonl"]
+
+metric_prefix = "asteroids_"
+
+# the format is guessed from the file name if it is not given
+def get_metrics_format(path):
+    if path.endswith(".jsonl") or path.endswith(".json"):
+        return "jsonl"
+    return "prometheus"
+
+class PhaseTimes:
+    'Sum, number, and maximum of the measured times (in seconds) of a frame phase'
+
+    def __init__(self):
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.total += seconds
+        self.count += 1
+        self.max = max(self.max, seconds)
+
+    def get_mean(self):
+        return self.total / self.count if self.count > 0 else 0.0
+
+class MetricsExporter:
+    'Aggregates game events and frame phase timings and writes them periodically to a local file'
+
+    def __init__(self, path, format=None, interval=1.0):
+        if format is None:
+            format = get_metrics_format(path)
+        # format and interval are given on the command line
+        if format not in metrics_formats:
+            raise ValueError("unknown metrics format '" + str(format) + "', formats are: " + ", ".join(metrics_formats))
+        if not interval > 0:
+            raise ValueError("metrics interval has to be positive")
+
+        self.path = path
+        self.format = format
+        self.interval = interval
+        self.events = None
+
+        # totals since the start
+        self.event_totals = { t.name: 0 for t in game_event_types }
+        self.phase_totals = {}
+        self.num_frames = 0
+
+        # values of the current interval
+        self.interval_start = time.perf_counter()
+        self.event_counts = { t.name: 0 for t in game_event_types }
+        self.phase_times = {}
+        self.interval_frames = 0
+        self.max_objects = 0
+
+        # values of the last interval that was written
+        self.event_rates = { t.name: 0.0 for t in game_event_types }
+        self.interval_phase_times = {}
+
+        # state of the last frame
+        self.frame = 0
+        self.num_objects = 0
+        self.points = 0
+        self.level = 0
+        self.lifes = 0
+
+        # create the file right away, so a path that cannot be written is reported before the game starts
+        if format == "jsonl":
+            # start a new file for every session
+            open(path, "w").close()
+        else:
+            self.write_prometheus()
+
+    # subscribes to the events of a world's event bus
+    def attach(self, events):
+        assert(self.events is None), "exporter is already attached"
+        self.events = events
+        for event_type in game_event_types:
+            events.subscribe(event_type, self.count_event)
+        events.subscribe(FrameFinished, self.finish_frame)
+
+    def detach(self):
+        if self.events is None:
+            return
+        for event_type in game_event_types:
+            self.events.unsubscribe(event_type, self.count_event)
+        self.events.unsubscribe(FrameFinished, self.finish_frame)
+        self.events = None
+
+    def count_event(self, event):
+        self.event_counts[event.name] += 1
+
+    # adds the time (in seconds) of a phase outside of the world's update, e.g., "render"
+    def record_phase(self, phase, seconds):
+        times = self.phase_times.get(phase)
+        if times is None:
+            times = self.phase_times[phase] = PhaseTimes()
+        times.add(seconds)
+
+    def finish_frame(self, event):
+        for phase, seconds in event.phase_times:
+            self.record_phase(phase, seconds)
+
+        self.frame = event.frame
+        self.num_objects = event.num_objects
+        self.max_objects = max(self.max_objects, event.num_objects)
+        self.points = event.points
+        self.level = event.level
+        self.lifes = event.lifes
+        self.interval_frames += 1
+
+        if time.perf_counter() - self.interval_start >= self.interval:
+            self.flush()
+
+    # closes the current interval and writes the metrics
+    def flush(self):
+        now = time.perf_counter()
+        duration = max(now - self.interval_start, 1e-9)
+
+        for name, count in self.event_counts.items():
+            self.event_totals[name] += count
+            self.event_rates[name] = count / duration
+        for phase, times in self.phase_times.items():
+            phase_total = self.phase_totals.get(phase)
+            if phase_total is None:
+                phase_total = self.phase_totals[phase] = PhaseTimes()
+            phase_total.total += times.total
+            phase_total.count += times.count
+            phase_total.max = max(phase_total.max, times.max)
+        self.num_frames += self.interval_frames
+        self.interval_phase_times = self.phase_times
+
+        if self.format == "jsonl":
+            self.append_jsonl(duration)
+        else:
+            self.write_prometheus()
+
+        self.interval_start = now
+        self.event_counts = { name: 0 for name in self.event_counts }
+        self.phase_times = {}
+        self.interval_frames = 0
+        self.max_objects = self.num_objects
+
+    def close(self):
+        self.detach()
+        if self.interval_frames > 0:
+            self.flush()
+
+    def append_jsonl(self, duration):
+        record = {
+            "time": round(time.time(), 3),
+            "frame": self.frame,
+            "duration_s": round(duration, 6),
+            "frames": self.interval_frames,
+            "events": self.event_counts,
+            "event_rates": { name: round(rate, 3) for name, rate in self.event_rates.items() },
+            "phases_ms": { phase: { "mean": round(1000 * times.get_mean(), 4), "max": round(1000 * times.max, 4) }
+                    for phase, times in self.interval_phase_times.items() },
+            "objects": self.num_objects,
+            "max_objects": self.max_objects,
+            "points": self.points,
+            "level": self.level,
+            "lifes": self.lifes,
+        }
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record, sort_keys=True) + "\n")
+
+    def write_prometheus(self):
+        lines = []
+
+        def add_metric(name, metric_type, help_text, samples):
+            lines.append("# HELP " + metric_prefix + name + " " + help_text)
+            lines.append("# TYPE " + metric_prefix + name + " " + metric_type)
+            for labels, value in samples:
+                lines.append(metric_prefix + name + labels + " " + repr(value))
+
+        add_metric("events_total", "counter", "Number of game events since the start.",
+                [ ('{event="' + name + '"}', total) for name, total in self.event_totals.items() ])
+        add_metric("event_rate", "gauge", "Game events per second in the last interval.",
+                [ ('{event="' + name + '"}', rate) for name, rate in self.event_rates.items() ])
+        add_metric("frames_total", "counter", "Number of updated frames since the start.", [ ("", self.num_frames) ])
+        add_metric("frame_phase_seconds", "summary", "Time spent in the phases of a frame.",
+                [ ('_sum{phase="' + phase + '"}', times.total) for phase, times in self.phase_totals.items() ] +
+                [ ('_count{phase="' + phase + '"}', times.count) for phase, times in self.phase_totals.items() ])
+        add_metric("frame_phase_max_seconds", "gauge", "Longest time spent in a phase of a frame in the last interval.",
+                [ ('{phase="' + phase + '"}', times.max) for phase, times in self.interval_phase_times.items() ])
+        add_metric("objects", "gauge", "Number of game objects in the last frame.", [ ("", self.num_objects) ])
+        add_metric("points", "gauge", "Score of the player.", [ ("", self.points) ])
+        add_metric("level", "gauge", "Current level.", [ ("", self.level) ])
+        add_metric("lifes", "gauge", "Remaining ships.", [ ("", self.lifes) ])
+
+        # replace the file at once, so readers never see a partially written file
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.path)
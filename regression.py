@@ -0,0 +1,158 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+# the game logic does not need a window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from controls import ACTION_FIRE, ACTION_LEFT, ACTION_RIGHT, ACTION_THRUST, InputState
+from scenarios import LevelSettings, Scenario, load_scenario
+from world import World
+
+# Runs a fixed set of seeded scenarios through the game logic and compares the results with a baseline
+# file: the checksum of the final game state has to match exactly (so optimizations cannot change the
+# gameplay), and the 95th percentile of the frame times must not be slower than the baseline by more
+# than the given threshold.
+#
+#   python3 regression.py                     compare with regression_baseline.json
+#   python3 regression.py --update-baseline   record a new baseline (after intended changes)
+
+default_baseline_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "regression_baseline.json")
+
+# lots of large asteroids that split up and generate debris
+def splitting_scenario():
+    levels = [ LevelSettings(12, [40, 60], [9, 11], 0.5) ]
+    return Scenario("splitting", levels, 1200, 800, spawn_mode = "random")
+
+# name: (scenario, seed, number of ticks)
+regression_scenarios = {
+    "classic": (lambda: load_scenario("classic"), 1, 3000),
+    "splitting": (splitting_scenario, 2, 600),
+    "stress_100": (lambda: load_scenario("stress_100"), 3, 120),
+}
+
+# duration of a tick in ms, the times of the scripted input are given in ms like the keyboard input
+tick_duration = 1000 / 60
+
+# player input depending on the tick: the ship turns, thrusts from time to time and fires regularly
+def get_scripted_input(world, tick):
+    tick_time = tick * tick_duration
+    if world.spaceship_destroyed:
+        # request a new ship from time to time
+        if tick % 30 == 0:
+            return InputState(ACTION_FIRE, time = tick_time)
+        return InputState(time = tick_time)
+
+    actions = ACTION_RIGHT if (tick // 200) % 2 == 0 else ACTION_LEFT
+    if tick % 100 < 15:
+        actions |= ACTION_THRUST
+
+    if tick % 8 == 0 and world.can_fire():
+        actions |= ACTION_FIRE
+
+    return InputState(actions, time = tick_time)
+
+def get_percentile(values, percentile):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(percentile / 100 * (len(values) - 1))))
+    return values[index]
+
+# returns the checksum of the final state and the frame times in milliseconds
+def run_scenario(name, collision_workers=0):
+    create_scenario, seed, num_ticks = regression_scenarios[name]
+    random.seed(seed)
+    world = World(create_scenario(), collision_workers)
+    frame_times = []
+    for tick in range(0, num_ticks):
+        world.apply_input(get_scripted_input(world, tick), 1)
+        t0 = time.perf_counter()
+        world.update(1)
+        frame_times.append(1000 * (time.perf_counter() - t0))
+    world.close()
+    return world.get_state_checksum(), frame_times
+
+def measure_scenario(name, repeat, collision_workers=0):
+    # the fastest of several runs is the least disturbed by other processes
+    result = None
+    for i in range(0, repeat):
+        checksum, frame_times = run_scenario(name, collision_workers)
+        if result is not None and checksum != result["checksum"]:
+            raise RuntimeError("scenario " + name + " is not deterministic")
+        p95 = get_percentile(frame_times, 95)
+        if result is None or p95 < result["p95_ms"]:
+            result = {
+                "checksum": checksum,
+                "ticks": len(frame_times),
+                "p50_ms": round(get_percentile(frame_times, 50), 4),
+                "p95_ms": round(p95, 4),
+                "max_ms": round(max(frame_times), 4),
+            }
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Checks game logic results and frame times against a baseline")
+    parser.add_argument("--baseline", default=default_baseline_file, help="baseline file (JSON)")
+    parser.add_argument("--update-baseline", action="store_true", help="write the current results as new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative p95 frame time regression (default: 0.25)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario, the fastest one is used")
+    parser.add_argument("--collision-workers", type=int, default=0, help="number of threads for the collision tests")
+    parser.add_argument("scenarios", nargs="*", help="scenarios to run (default: all)")
+    args = parser.parse_args()
+
+    names = args.scenarios or list(regression_scenarios)
+    for name in names:
+        if name not in regression_scenarios:
+            print("Unknown regression scenario: " + name)
+            return 1
+
+    baseline = {}
+    if os.path.isfile(args.baseline):
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f).get("scenarios", {})
+
+    results = {}
+    failed = False
+    print("{0:<12} {1:>6} {2:>9} {3:>9} {4:>9} {5:>12}  {6}".format("scenario", "ticks", "p50 ms", "p95 ms", "max ms", "base p95 ms", "result"))
+    for name in names:
+        result = measure_scenario(name, args.repeat, args.collision_workers)
+        results[name] = result
+
+        status = "ok"
+        base_p95 = "-"
+        if args.update_baseline:
+            status = "recorded"
+        elif name not in baseline:
+            status = "no baseline"
+        else:
+            base = baseline[name]
+            base_p95 = "{0:.3f}".format(base["p95_ms"])
+            if base["checksum"] != result["checksum"] or base["ticks"] != result["ticks"]:
+                status = "FAILED: game state differs from baseline"
+                failed = True
+            elif result["p95_ms"] > base["p95_ms"] * (1 + args.threshold):
+                status = "FAILED: p95 frame time regressed by {0:.0f}%".format(100 * (result["p95_ms"] / base["p95_ms"] - 1))
+                failed = True
+
+        print("{0:<12} {1:>6} {2:>9.3f} {3:>9.3f} {4:>9.3f} {5:>12}  {6}".format(name, result["ticks"], result["p50_ms"],
+                result["p95_ms"], result["max_ms"], base_p95, status))
+
+    if args.update_baseline:
+        # keep the baseline of scenarios that were not run
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "scenarios": baseline,
+            }, f, indent=4, sort_keys=True)
+            f.write("\n")
+        print("Baseline written to " + args.baseline)
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+import pygame
+
+from game_objects import Asteroid
+
+# level of detail settings at full quality, they are relaxed linearly when the quality drops to 0
+# objects up to this size (in pixels) are drawn as a single pixel
+point_size = 3
+point_size_min_quality = 12
+# objects whose color differs from the background by at most this value are not drawn at all
+invisible_contrast = 8
+invisible_contrast_min_quality = 48
+# asteroids up to this size (in pixels) are drawn with fewer vertices
+simplify_size = 24
+simplify_size_min_quality = 80
+
+# quality adjustment per frame if the frame time is above (or well below) the target
+quality_decrease = 0.1
+quality_increase = 0.01
+min_quality = 0.0
+
+def interpolate(full_quality_value, min_quality_value, quality):
+    return quality * full_quality_value + (1 - quality) * min_quality_value
+
+class Renderer:
+    'Draws the game objects with a level of detail that depends on their size and color and on the frame time'
+
+    def __init__(self, bg_color, target_frame_time=1000 / 60, lod_enabled=True, fixed_quality=None):
+        self.bg_color = bg_color
+        self.target_frame_time = target_frame_time
+        self.lod_enabled = lod_enabled
+        # a fixed quality is not adjusted to the frame time, e.g., to measure the rendering time at that quality
+        self.fixed_quality = fixed_quality
+        # 1: full quality, 0: lowest quality
+        self.quality = 1.0 if fixed_quality is None else fixed_quality
+        self.update_thresholds()
+
+        assert(min_quality <= self.quality <= 1.0), "quality out of range"
+
+    def get_quality(self):
+        return self.quality
+
+    def update_thresholds(self):
+        self.point_size = interpolate(point_size, point_size_min_quality, self.quality)
+        self.invisible_contrast = interpolate(invisible_contrast, invisible_contrast_min_quality, self.quality)
+        self.simplify_size = interpolate(simplify_size, simplify_size_min_quality, self.quality)
+
+    # lowers the quality if the last frame took longer than the target time, and slowly raises it again
+    def adjust_quality(self, frame_time):
+        if self.fixed_quality is not None:
+            return
+        if frame_time > self.target_frame_time:
+            self.quality = max(min_quality, self.quality - quality_decrease)
+        elif frame_time < 0.8 * self.target_frame_time:
+            self.quality = min(1.0, self.quality + quality_increase)
+        self.update_thresholds()
+
+    def get_contrast(self, color):
+        return max(abs(color[0] - self.bg_color[0]), abs(color[1] - self.bg_color[1]), abs(color[2] - self.bg_color[2]))
+
+    def render_polygon(self, surface, p, points):
+        color = p.get_color()
+        pygame.draw.polygon(surface, color, points, 1)
+        for m_x, m_y in p.screen_wrap_modifiers:
+            pygame.draw.polygon(surface, color, [(x + m_x, y + m_y) for x, y in points], 1)
+
+    def render(self, world, surface):
+        if not self.lod_enabled:
+            world.render(surface)
+            return
+
+        objects = []
+        if not world.spaceship_destroyed:
+            objects.append(world.spaceship)
+        objects.extend(world.asteroids)
+        objects.extend(world.fired_shots)
+
+        # small objects are collected and drawn as single pixels in one go
+        points = []
+        for p in objects:
+            color = p.get_color()
+            if self.get_contrast(color) <= self.invisible_contrast:
+                continue
+
+            aabb = p.get_aabb()
+            size = max(aabb[2] - aabb[0], aabb[3] - aabb[1])
+            if size <= self.point_size:
+                points.append((p.get_translation(), color))
+                continue
+
+            outline = p.get_transformed_points()
+            if isinstance(p, Asteroid) and size <= self.simplify_size and len(outline) > 3:
+                # skip vertices, the smaller the asteroid the more (but keep at least 3)
+                step = min(int(self.simplify_size / size) + 1, len(outline) // 3)
+                if step > 1:
+                    outline = outline[::step]
+
+            self.render_polygon(surface, p, outline)
+
+        width, height = surface.get_width(), surface.get_height()
+        set_at = surface.set_at
+        surface.lock()
+        for position, color in points:
+            set_at((int(position.x) % width, int(position.y) % height), color)
+
+        # debris is never larger than a few pixels, so it is always drawn as points. as there are usually
+        # lots of debris objects, this is done in a separate loop without any method calls
+        bg_r, bg_g, bg_b = self.bg_color
+        contrast = self.invisible_contrast
+        for d in world.debris_objects:
+            color = d.color
+            if abs(color[0] - bg_r) <= contrast and abs(color[1] - bg_g) <= contrast and abs(color[2] - bg_b) <= contrast:
+                continue
+            position = d.translation
+            set_at((int(position.x) % width, int(position.y) % height), color)
+        surface.unlock()
@@ -0,0 +1,171 @@
+import json
+import math
+import os
+
+# TOML scenario files are only supported if the standard library can parse them (Python >= 3.11)
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+class LevelSettings:
+    'Settings for a single level: how many asteroids are spawned and what they look like'
+
+    def __init__(self, num_asteroids, radius_range, vertex_range, speed_bonus):
+        self.num_asteroids = num_asteroids
+        # radius and number of vertices are drawn uniformly from [min, max]
+        self.radius_range = radius_range
+        self.vertex_range = vertex_range
+        self.speed_bonus = speed_bonus
+
+        # settings come from user files, so they are checked even if assertions are disabled
+        if num_asteroids < 0:
+            raise ValueError("negative number of asteroids")
+        if radius_range[0] <= 0 or radius_range[0] > radius_range[1]:
+            raise ValueError("invalid radius range, radii must be positive")
+        if vertex_range[0] < 3 or vertex_range[0] > vertex_range[1]:
+            raise ValueError("invalid vertex range, asteroids need at least 3 vertices")
+        if not math.isfinite(speed_bonus):
+            raise ValueError("speed bonus must be a finite number")
+
+    def get_num_asteroids(self):
+        return self.num_asteroids
+
+    def get_radius_range(self):
+        return self.radius_range
+
+    def get_vertex_range(self):
+        return self.vertex_range
+
+    def get_speed_bonus(self):
+        return self.speed_bonus
+
+class Scenario:
+    'A list of levels together with the global settings they are played with'
+
+    def __init__(self, name, levels, screen_width=1024, screen_height=768, shot_limit=10, max_shot_range=620,
+                 debris_density=1.0, lifes=3, spawn_mode="border"):
+        self.name = name
+        self.levels = levels
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.shot_limit = shot_limit
+        self.max_shot_range = max_shot_range
+        # factor for the number of debris particles generated when objects are destroyed
+        self.debris_density = debris_density
+        self.lifes = lifes
+        # "border": asteroids spawn at fixed positions along the screen border (classic game), levels with
+        #           more asteroids than border positions (12) spawn them randomly
+        # "random": asteroids spawn anywhere on the screen (needed for a large number of asteroids)
+        self.spawn_mode = spawn_mode
+
+        if len(levels) == 0:
+            raise ValueError("scenario needs at least one level")
+        if screen_width <= 0 or screen_height <= 0:
+            raise ValueError("screen size must be positive")
+        if shot_limit <= 0:
+            raise ValueError("shot limit must be positive")
+        if not (math.isfinite(max_shot_range) and max_shot_range > 0):
+            raise ValueError("max. shot range must be a positive number")
+        if not (math.isfinite(debris_density) and debris_density >= 0):
+            raise ValueError("debris density must be a finite number that is not negative")
+        if lifes <= 0:
+            raise ValueError("number of lifes must be positive")
+        if spawn_mode not in ["border", "random"]:
+            raise ValueError("unknown spawn mode: " + str(spawn_mode))
+
+    def get_num_levels(self):
+        return len(self.levels)
+
+    def get_level(self, level):
+        # levels are numbered starting with 1, the last level is repeated endlessly
+        return self.levels[max(1, min(level, len(self.levels))) - 1]
+
+# --------------------------
+# loading scenarios
+# --------------------------
+
+def _get_range(data, key, default):
+    value = data.get(key, default)
+    if isinstance(value, (int, float)):
+        return [value, value]
+    if not isinstance(value, list) or len(value) != 2:
+        raise ValueError("'" + key + "' must be a number or a list [min, max]")
+    return [value[0], value[1]]
+
+def scenario_from_dict(data, name="custom"):
+    if not isinstance(data, dict):
+        raise ValueError("scenario must be a table of settings")
+    if not isinstance(data.get("levels"), list) or not data["levels"]:
+        raise ValueError("scenario needs a non-empty list of 'levels'")
+
+    levels = []
+    for i, level_data in enumerate(data["levels"]):
+        level = i + 1
+        if not isinstance(level_data, dict):
+            raise ValueError("invalid settings for level " + str(level) + ": must be a table of settings")
+        try:
+            levels.append(LevelSettings(
+                int(level_data.get("asteroids", level)),
+                [int(r) for r in _get_range(level_data, "radius", 50)],
+                [int(v) for v in _get_range(level_data, "vertices", 11)],
+                float(level_data.get("speed_bonus", level / 10))))
+        except (ValueError, TypeError, OverflowError) as e:
+            raise ValueError("invalid settings for level " + str(level) + ": " + str(e))
+
+    try:
+        return Scenario(str(data.get("name", name)), levels,
+                screen_width = int(data.get("screen_width", 1024)),
+                screen_height = int(data.get("screen_height", 768)),
+                shot_limit = int(data.get("shot_limit", 10)),
+                max_shot_range = float(data.get("max_shot_range", 620)),
+                debris_density = float(data.get("debris_density", 1.0)),
+                lifes = int(data.get("lifes", 3)),
+                spawn_mode = data.get("spawn_mode", "border"))
+    except (ValueError, TypeError, OverflowError) as e:
+        raise ValueError("invalid scenario: " + str(e))
+
+def load_scenario_file(path):
+    name = os.path.splitext(os.path.basename(path))[0]
+    if path.endswith(".toml"):
+        if tomllib is None:
+            raise ValueError("TOML scenario files need Python 3.11 or newer, use JSON instead")
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+    else:
+        with open(path, "r") as f:
+            data = json.load(f)
+
+    return scenario_from_dict(data, name)
+
+# --------------------------
+# built-in scenarios
+# --------------------------
+
+# the original game: n asteroids in level n, up to level 9
+def classic_scenario():
+    levels = [ LevelSettings(n, [50, 50], [11, 11], n / 10) for n in range(1, 10) ]
+    return Scenario("classic", levels)
+
+# stress tests with a fixed number of asteroids which scale the screen so that asteroids still fit
+def stress_scenario(num_asteroids, screen_width, screen_height, radius_range):
+    levels = [ LevelSettings(num_asteroids, radius_range, [5, 11], 0.1) ]
+    return Scenario("stress_" + str(num_asteroids), levels, screen_width, screen_height,
+            lifes = 1000000, spawn_mode = "random")
+
+builtin_scenarios = {
+    "classic": classic_scenario,
+    "stress_100": lambda: stress_scenario(100, 1920, 1080, [12, 30]),
+    "stress_500": lambda: stress_scenario(500, 2560, 1440, [8, 22]),
+    "stress_2000": lambda: stress_scenario(2000, 4096, 2304, [6, 16]),
+}
+
+# load a built-in scenario by name or a scenario file (JSON or TOML) by path
+def load_scenario(name_or_path):
+    if name_or_path in builtin_scenarios:
+        return builtin_scenarios[name_or_path]()
+
+    if not os.path.isfile(name_or_path):
+        raise ValueError("unknown scenario '" + name_or_path + "', built-in scenarios are: " + ", ".join(sorted(builtin_scenarios)))
+
+    return load_scenario_file(name_or_path)
@@ -0,0 +1,238 @@
+import os
+import struct
+import sys
+import time
+
+from array import array
+from multiprocessing import shared_memory
+
+# The world state is published into a shared memory block so that other local processes (renderers,
+# recorders, monitoring tools) can read it without slowing down the game. The block starts with a
+# header, followed by a ring buffer of slots. Each slot holds the state of one frame:
+#
+#   header: magic, layout version, number of slots, slot size, max. objects, max. vertices,
+#           screen width, screen height, number of the latest complete frame (-1: none yet)
+#   slot:   sequence number (odd while the slot is written), frame number, points, level, lifes,
+#           flags, number of objects, number of vertices
+#           object records: kind, color (r, g, b), translation (x, y), rotation angle,
+#                           index of the first vertex, number of vertices
+#           vertex buffer: transformed vertices as float32 (x, y) pairs
+#
+# All values are little endian. The layout version has to be increased for every change of the layout.
+
+layout_magic = b"ASTW"
+layout_version = 1
+
+header_format = struct.Struct("<4sIIIIIIIq")
+slot_header_format = struct.Struct("<QQIIIIII")
+object_fields = "BBBBfffII"
+object_format = struct.Struct("<" + object_fields)
+vertex_format = struct.Struct("<ff")
+
+# offset of the latest frame number within the header
+latest_frame_offset = header_format.size - 8
+
+# object kinds
+KIND_SPACESHIP = 0
+KIND_ASTEROID = 1
+KIND_SHOT = 2
+KIND_DEBRIS = 3
+
+# flags
+FLAG_SPACESHIP_DESTROYED = 1
+FLAG_GAME_OVER = 2
+FLAG_TRUNCATED = 4  # not all objects fit into the slot
+
+# names of the shared memory blocks created by the publishers in this process
+published_names = set()
+
+def get_slot_size(max_objects, max_vertices):
+    return slot_header_format.size + max_objects * object_format.size + max_vertices * vertex_format.size
+
+class WorldStatePublisher:
+    'Writes the world state of every frame into a ring buffer in shared memory'
+
+    def __init__(self, name, screen_width, screen_height, max_objects=20000, max_vertices=100000, num_slots=4):
+        assert(num_slots > 1), "ring buffer needs at least two slots"
+        self.num_slots = num_slots
+        self.max_objects = max_objects
+        self.max_vertices = max_vertices
+        self.slot_size = get_slot_size(max_objects, max_vertices)
+        self.frame = 0
+
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=header_format.size + num_slots * self.slot_size)
+        self.buffer = self.shm.buf
+        published_names.add(self.shm.name)
+        header_format.pack_into(self.buffer, 0, layout_magic, layout_version, num_slots, self.slot_size,
+                max_objects, max_vertices, screen_width, screen_height, -1)
+
+    def get_name(self):
+        return self.shm.name
+
+    def close(self):
+        self.buffer = None
+        published_names.discard(self.shm.name)
+        self.shm.close()
+        self.shm.unlink()
+
+    def publish(self, world):
+        buffer = self.buffer
+        slot_offset = header_format.size + (self.frame % self.num_slots) * self.slot_size
+
+        # mark the slot as being written (odd sequence number), readers will skip or discard it
+        sequence = struct.unpack_from("<Q", buffer, slot_offset)[0]
+        struct.pack_into("<Q", buffer, slot_offset, sequence + 1)
+
+        groups = [
+            (KIND_SPACESHIP, [] if world.spaceship_destroyed else [world.spaceship]),
+            (KIND_ASTEROID, world.asteroids),
+            (KIND_SHOT, world.fired_shots),
+            (KIND_DEBRIS, world.debris_objects),
+        ]
+
+        flags = 0
+        if world.spaceship_destroyed:
+            flags |= FLAG_SPACESHIP_DESTROYED
+        if world.game_over:
+            flags |= FLAG_GAME_OVER
+
+        # the object records and the vertices of all objects are collected and each written at once,
+        # packing them object by object would take a considerable part of the frame time
+        values = []
+        vertices = array('d')
+        num_objects, num_vertices = 0, 0
+        max_objects, max_vertices = self.max_objects, self.max_vertices
+        for kind, group in groups:
+            for p in group:
+                p_vertices = p.get_transformed_vertices()
+                p_num_vertices = len(p_vertices) // 2
+                if num_objects >= max_objects or num_vertices + p_num_vertices > max_vertices:
+                    flags |= FLAG_TRUNCATED
+                    break
+                color = p.color
+                translation = p.translation
+                # colors of all game objects are integers, so they can be packed without conversion
+                values += (kind, color[0], color[1], color[2], translation.x, translation.y,
+                        p.rotation_angle, num_vertices, p_num_vertices)
+                vertices.extend(p_vertices)
+                num_objects += 1
+                num_vertices += p_num_vertices
+            if flags & FLAG_TRUNCATED:
+                break
+
+        struct.pack_into("<" + object_fields * num_objects, buffer, slot_offset + slot_header_format.size, *values)
+
+        vertices = array('f', vertices)
+        if sys.byteorder != "little":
+            vertices.byteswap()
+        vertex_offset = slot_offset + slot_header_format.size + self.max_objects * object_format.size
+        buffer[vertex_offset:vertex_offset + len(vertices) * vertices.itemsize] = memoryview(vertices).cast("B")
+
+        slot_header_format.pack_into(buffer, slot_offset, sequence + 1, self.frame, world.points, world.level,
+                max(0, world.lifes), flags, num_objects, num_vertices)
+
+        # the slot is complete: even sequence number, then announce it as the latest frame
+        struct.pack_into("<Q", buffer, slot_offset, sequence + 2)
+        struct.pack_into("<q", buffer, latest_frame_offset, self.frame)
+        self.frame += 1
+
+class WorldSnapshot:
+    'A view on one frame in the shared memory, the data is only valid as long as is_valid() returns True'
+
+    def __init__(self, reader, slot_offset, sequence):
+        self.reader = reader
+        self.slot_offset = slot_offset
+        self.sequence = sequence
+        (_, self.frame, self.points, self.level, self.lifes, self.flags,
+                self.num_objects, self.num_vertices) = slot_header_format.unpack_from(reader.buffer, slot_offset)
+
+    def is_valid(self):
+        # the slot has not been overwritten by the publisher in the meantime
+        return struct.unpack_from("<Q", self.reader.buffer, self.slot_offset)[0] == self.sequence
+
+    def get_object(self, index):
+        # returns (kind, color, x, y, rotation angle, first vertex, number of vertices)
+        assert(index < self.num_objects), "object index out of range"
+        values = object_format.unpack_from(self.reader.buffer, self.slot_offset + slot_header_format.size + index * object_format.size)
+        return (values[0], values[1:4], values[4], values[5], values[6], values[7], values[8])
+
+    def iter_objects(self):
+        for index in range(0, self.num_objects):
+            yield self.get_object(index)
+
+    def get_vertices(self):
+        # zero-copy view on the vertex buffer as flat float32 values x0, y0, x1, y1, ...
+        start = self.slot_offset + slot_header_format.size + self.reader.max_objects * object_format.size
+        return self.reader.buffer[start:start + self.num_vertices * vertex_format.size].cast("f")
+
+class WorldStateReader:
+    'Attaches to the shared memory of a WorldStatePublisher (possibly in another process)'
+
+    def __init__(self, name):
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # before Python 3.13, attaching registers the shared memory at the resource tracker, which would
+            # remove it when the reader exits. the registration is undone, unless the publisher is in the same
+            # process: the tracker knows each name only once, so it would undo the publisher's registration.
+            # limitation: a reader in a child process (multiprocessing) shares the resource tracker of its
+            # parent, so it must not attach to memory published by its parent on these Python versions
+            self.shm = shared_memory.SharedMemory(name=name)
+            if os.name == "posix" and self.shm.name not in published_names:
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister("/" + self.shm.name, "shared_memory")
+        self.buffer = self.shm.buf
+
+        (magic, version, self.num_slots, self.slot_size, self.max_objects, self.max_vertices,
+                self.screen_width, self.screen_height, _) = header_format.unpack_from(self.buffer, 0)
+        if magic != layout_magic or version != layout_version:
+            self.close()
+            raise ValueError("unsupported shared memory layout (version " + str(version) + ", expected " + str(layout_version) + ")")
+
+    def close(self):
+        self.buffer = None
+        self.shm.close()
+
+    def get_latest_frame(self):
+        return struct.unpack_from("<q", self.buffer, latest_frame_offset)[0]
+
+    # returns a snapshot of the latest complete frame or None if no frame has been published yet
+    def read_latest(self):
+        while True:
+            frame = self.get_latest_frame()
+            if frame < 0:
+                return None
+            slot_offset = header_format.size + (frame % self.num_slots) * self.slot_size
+            sequence = struct.unpack_from("<Q", self.buffer, slot_offset)[0]
+            if sequence % 2 == 1:
+                continue
+            snapshot = WorldSnapshot(self, slot_offset, sequence)
+            if snapshot.frame == frame and snapshot.is_valid():
+                return snapshot
+
+# simple monitor for a running game: python3 shared_state.py <name>
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python3 shared_state.py <shared memory name>")
+        sys.exit(1)
+
+    reader = WorldStateReader(sys.argv[1])
+    last_frame = reader.get_latest_frame()
+    try:
+        while True:
+            time.sleep(1)
+            snapshot = reader.read_latest()
+            if snapshot is None:
+                continue
+            counts = [0, 0, 0, 0]
+            for obj in snapshot.iter_objects():
+                counts[obj[0]] += 1
+            if snapshot.is_valid():
+                print("Frame: " + str(snapshot.frame) + " (" + str(snapshot.frame - last_frame) + "/s)"
+                        + ", score: " + str(snapshot.points) + ", level: " + str(snapshot.level) + ", ships: " + str(snapshot.lifes)
+                        + ", asteroids: " + str(counts[KIND_ASTEROID]) + ", shots: " + str(counts[KIND_SHOT])
+                        + ", debris: " + str(counts[KIND_DEBRIS]))
+            last_frame = snapshot.frame
+    except KeyboardInterrupt:
+        pass
+    reader.close()
@@ -0,0 +1,439 @@
+import hashlib
+import math
+import pygame
+import random
+import time
+
+from game_objects import Spaceship, LaserShot, Asteroid, Debris
+from collision import CollisionDetector
+from controls import ACTION_LEFT, ACTION_RIGHT, ACTION_THRUST
+from events import EventBus, AsteroidDestroyed, ShotFired, ShipLost, LevelStarted, FrameFinished
+
+# color settings
+spaceship_color = [50,255,50]
+asteroid_color = [200, 200, 200]
+debris_color = [180, 180, 180]
+
+# configuration
+asteroid_points = 10
+
+# TODO: allow for some randomness in asteroid spawn position
+spawn_border = 55
+
+# minimal distance of randomly spawned asteroids to the player
+spawn_safety_distance = 150
+
+# number of random positions tried for a new asteroid, if none is far enough from the player and
+# from all other asteroids (e.g., on very small or crowded screens), the best one is used
+spawn_attempts = 100
+
+# the vertices of an asteroid are up to 30% farther from its center than its radius (see game_objects.py)
+asteroid_extent = 1.3
+
+def random_in_range(value_range):
+    # do not consume random numbers for fixed values, so the classic game keeps its random sequence
+    if value_range[0] == value_range[1]:
+        return value_range[0]
+    return random.randint(value_range[0], value_range[1])
+
+class SpawnGrid:
+    'Circles on a grid over the (wrapping) screen, to spawn asteroids without overlapping the existing ones'
+
+    def __init__(self, screen_width, screen_height, max_radius):
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        # overlapping circles are at most one cell apart
+        cell_size = max(1, 2 * max_radius)
+        self.num_cells_x = max(1, int(screen_width // cell_size))
+        self.num_cells_y = max(1, int(screen_height // cell_size))
+        self.cell_width = screen_width / self.num_cells_x
+        self.cell_height = screen_height / self.num_cells_y
+        self.cells = {}
+
+    def get_cell(self, pos):
+        return (int(pos.x // self.cell_width) % self.num_cells_x, int(pos.y // self.cell_height) % self.num_cells_y)
+
+    def insert(self, pos, radius):
+        self.cells.setdefault(self.get_cell(pos), []).append((pos.x, pos.y, radius))
+
+    def overlaps(self, pos, radius):
+        cell_x, cell_y = self.get_cell(pos)
+        neighbors = { ((cell_x + i) % self.num_cells_x, (cell_y + j) % self.num_cells_y) for i in (-1, 0, 1) for j in (-1, 0, 1) }
+        for cell in neighbors:
+            for x, y, r in self.cells.get(cell, ()):
+                # distances across the screen edges count as well
+                dx = abs(pos.x - x)
+                dx = min(dx, self.screen_width - dx)
+                dy = abs(pos.y - y)
+                dy = min(dy, self.screen_height - dy)
+                if dx * dx + dy * dy < (radius + r) * (radius + r):
+                    return True
+        return False
+
+class World:
+    'The game state and logic of a scenario, independent of any display or input device'
+
+    def __init__(self, scenario, collision_workers=0):
+        self.scenario = scenario
+        self.screen_width = scenario.screen_width
+        self.screen_height = scenario.screen_height
+        self.shot_limit = scenario.shot_limit
+        self.max_shot_range = scenario.max_shot_range
+
+        # game object initialization
+        self.fired_shots = []
+        self.asteroids = []
+        self.debris_objects = []
+        self.points = 0
+        self.level = 0
+        self.lifes = scenario.lifes
+        # number of updates so far
+        self.frame = 0
+
+        # game events (see events.py), nothing is published as long as nobody subscribed
+        self.events = EventBus()
+
+        # shots requested in this frame, given by the time since the request (in frames)
+        self.shot_requests = []
+
+        self.spaceship_destroyed = False
+        self.game_over = False
+
+        screen_width, screen_height = self.screen_width, self.screen_height
+        self.asteroid_spawn_positions = [
+                pygame.math.Vector2(spawn_border, spawn_border),
+                pygame.math.Vector2(screen_width // 3, spawn_border),
+                pygame.math.Vector2(screen_width // 3 * 2, spawn_border),
+                pygame.math.Vector2(screen_width - spawn_border, spawn_border),
+
+                pygame.math.Vector2(spawn_border, screen_height - spawn_border),
+                pygame.math.Vector2(screen_width // 3, screen_height - spawn_border),
+                pygame.math.Vector2(screen_width // 3 * 2, screen_height - spawn_border),
+                pygame.math.Vector2(screen_width - spawn_border, screen_height - spawn_border),
+
+                pygame.math.Vector2(spawn_border, screen_height // 3),
+                pygame.math.Vector2(spawn_border, screen_height // 3 * 2),
+                pygame.math.Vector2(screen_width - spawn_border, screen_height // 3),
+                pygame.math.Vector2(screen_width - spawn_border, screen_height // 3 * 2)
+                ]
+
+        self.spaceship = Spaceship(spaceship_color)
+        self.spaceship.set_translation(pygame.math.Vector2(screen_width//2,screen_height//2))
+
+        # with more than one worker, the collision tests are distributed to a thread pool
+        self.collision_detector = CollisionDetector(screen_width, screen_height, collision_workers)
+
+    def close(self):
+        self.collision_detector.close()
+
+    def get_num_objects(self):
+        return len(self.asteroids) + len(self.fired_shots) + len(self.debris_objects) + 1
+
+    # hash over the game state, two runs of a scenario with the same seed and inputs give the same checksum
+    def get_state_checksum(self):
+        h = hashlib.sha1()
+        h.update(repr((self.points, self.level, self.lifes, self.spaceship_destroyed, self.game_over)).encode())
+        for objects in [[self.spaceship], self.asteroids, self.fired_shots, self.debris_objects]:
+            h.update(str(len(objects)).encode())
+            for o in objects:
+                t = o.get_translation()
+                h.update("{0:.6f} {1:.6f} {2:.6f} {3:.6f}".format(t.x, t.y, o.get_rotation_angle(), o.get_speed()).encode())
+        return h.hexdigest()
+
+    def can_fire(self):
+        return len(self.fired_shots) < self.shot_limit
+
+    def get_num_debris(self, radius):
+        return int(radius * self.scenario.debris_density)
+
+    def get_border_spawn_position(self):
+        # find the spawn position that maximizes distance to all of the game objects (TODO: revise)
+        max_dist = 0
+        spawn_pos = pygame.math.Vector2(0,0)
+        for pos in self.asteroid_spawn_positions:
+            min_dist_vec = (self.spaceship.get_translation() - pos).length_squared()
+            for a in self.asteroids:
+                min_dist_vec = min(min_dist_vec, (a.get_translation() - pos).length_squared())
+            if min_dist_vec > max_dist:
+                max_dist = min_dist_vec
+                spawn_pos = pos
+        return spawn_pos
+
+    def get_random_spawn_position(self, radius=0, spawn_grid=None):
+        # spawn anywhere on the screen, but not right on top of the player or of another asteroid
+        best_pos, best_dist = None, -1
+        for i in range(0, spawn_attempts):
+            pos = pygame.math.Vector2(random.uniform(0, self.screen_width), random.uniform(0, self.screen_height))
+            dist = (pos - self.spaceship.get_translation()).length()
+            if dist > spawn_safety_distance:
+                if spawn_grid is None or not spawn_grid.overlaps(pos, radius):
+                    return pos
+                # far enough from the player, so it is better than any position that is not
+                dist = math.inf
+            if dist > best_dist:
+                best_pos, best_dist = pos, dist
+        return best_pos
+
+    def start_next_level(self):
+        self.level = min(self.scenario.get_num_levels(), self.level + 1)
+        settings = self.scenario.get_level(self.level)
+        random.shuffle(self.asteroid_spawn_positions)
+
+        # there are only a few spawn positions at the border, levels with more asteroids spawn them randomly
+        spawn_grid = None
+        if self.scenario.spawn_mode == "random" or settings.get_num_asteroids() > len(self.asteroid_spawn_positions):
+            max_radius = max([settings.get_radius_range()[1]] + [a.get_radius() for a in self.asteroids])
+            spawn_grid = SpawnGrid(self.screen_width, self.screen_height, asteroid_extent * max_radius)
+            for a in self.asteroids:
+                spawn_grid.insert(a.get_translation(), asteroid_extent * a.get_radius())
+
+        for i in range(0, settings.get_num_asteroids()):
+            radius = random_in_range(settings.get_radius_range())
+            num_vertices = random_in_range(settings.get_vertex_range())
+            asteroid = Asteroid(radius, num_vertices, [ c + min(255, int(random.uniform(-15,15))) for c in asteroid_color] )
+            if spawn_grid is not None:
+                asteroid.set_translation(self.get_random_spawn_position(asteroid_extent * radius, spawn_grid))
+                spawn_grid.insert(asteroid.get_translation(), asteroid_extent * radius)
+            else:
+                asteroid.set_translation(pygame.math.Vector2(self.get_border_spawn_position()))
+                # set a direction that more or less moves towards the screen center
+                a_dir = pygame.math.Vector2(self.screen_width // 2, self.screen_height // 2) - asteroid.get_translation()
+                a_dir.rotate_ip(random.uniform(-35, 35))
+                asteroid.set_direction(a_dir.normalize())
+            asteroid.set_speed(asteroid.get_speed() + settings.get_speed_bonus())
+            self.asteroids.append(asteroid)
+
+        if self.events.has_subscribers(LevelStarted):
+            self.events.publish(LevelStarted(self.frame, self.level, settings.get_num_asteroids()))
+
+    # applies the input of a tick, which comes from the keyboard, a script, or a replay (see controls.py)
+    def apply_input(self, input_state, fps_factor):
+        # fire shots, or create a new ship if allowed
+        for request_time in input_state.fire_requests:
+            if self.spaceship_destroyed:
+                if not self.game_over:
+                    self.spaceship_destroyed = False
+            else:
+                age = min(fps_factor, max(0, (input_state.time - request_time) * 60 / 1000))
+                self.shot_requests.append(age)
+
+        if not self.spaceship_destroyed:
+            if input_state.is_active(ACTION_RIGHT):
+                self.spaceship.rotate(1.5 * fps_factor)
+            if input_state.is_active(ACTION_LEFT):
+                self.spaceship.rotate(-1.5 * fps_factor)
+            if input_state.is_active(ACTION_THRUST):
+                self.spaceship.add_thrust(0.1 * fps_factor)
+
+    def update(self, fps_factor):
+        screen_width, screen_height = self.screen_width, self.screen_height
+        spaceship = self.spaceship
+        asteroids = self.asteroids
+        fired_shots = self.fired_shots
+        debris_objects = self.debris_objects
+        self.frame += 1
+
+        # decide once per frame which events are needed
+        events = self.events
+        publish_shots = events.has_subscribers(ShotFired)
+        publish_asteroids = events.has_subscribers(AsteroidDestroyed)
+        measure_phases = events.has_subscribers(FrameFinished)
+        if measure_phases:
+            t_start = time.perf_counter()
+
+        # check if we need to progress to the next level
+        if not asteroids:
+            self.start_next_level()
+
+        # object movement
+        if not self.spaceship_destroyed:
+            spaceship.move(1 * fps_factor)
+            spaceship.screen_wrap(screen_width, screen_height)
+
+        for s in fired_shots:
+            s.move(1 * fps_factor)
+            s.screen_wrap(screen_width, screen_height)
+
+        for age in self.shot_requests:
+            if len(fired_shots) >= self.shot_limit:
+                break
+            # create a new shot
+            position = spaceship.get_tip_position()
+            displacement_vector = pygame.math.Vector2(0,-1)
+            displacement_vector.rotate_ip(spaceship.get_rotation_angle())
+            s = LaserShot(position + displacement_vector, displacement_vector, spaceship.get_rotation_angle(), self.max_shot_range)
+            s.set_speed(6)
+            # shots requested earlier in the frame have already traveled a bit, so they do not overlap
+            if age > 0:
+                s.move(age)
+            fired_shots.append(s)
+            if publish_shots:
+                events.publish(ShotFired(self.frame, s.get_translation(), s.get_rotation_angle()))
+        self.shot_requests = []
+
+        for a in asteroids:
+            a.move(1 * fps_factor)
+            a.screen_wrap(screen_width, screen_height)
+
+        for d in debris_objects:
+            d.move(1 * fps_factor)
+            d.screen_wrap(screen_width, screen_height)
+
+        if measure_phases:
+            t_movement = time.perf_counter()
+
+        # check collisions (the pairs are found in the same order as in nested loops over both lists)
+        collision_detector = self.collision_detector
+
+        # 1. shots against asteroids
+        for i, j in collision_detector.find_collisions(fired_shots, asteroids):
+            s, a = fired_shots[i], asteroids[j]
+            # player hit an asteroid -> points
+            if not self.game_over:
+                self.points = min(99999999, self.points + asteroid_points)
+            # destroy objects
+            s.set_destroyed()
+            a.set_destroyed()
+            a.set_destruction_vector(s.get_direction())
+            a.set_destruction_speed(s.get_speed() / 2)
+
+        # 2. shots against player will just be destroyed
+        if not self.spaceship_destroyed:
+            for i, j in collision_detector.find_collisions(fired_shots, [spaceship]):
+                fired_shots[i].set_destroyed()
+
+        # 3. player against asteroids
+        if not self.spaceship_destroyed:
+            for i, j in collision_detector.find_collisions([spaceship], asteroids):
+                a = asteroids[j]
+                a.set_destroyed()
+                d_vec = (a.get_translation() - spaceship.get_translation() + spaceship.get_direction()).normalize()
+                a.set_destruction_vector(d_vec)
+                spaceship.set_destroyed()
+
+        # 4. asteroids against asteroids
+        for i, j in collision_detector.find_collisions(asteroids):
+            asteroids[i].set_destroyed()
+            #asteroids[i].set_destruction_vector(asteroids[j].get_direction())
+            d_vec1 = (asteroids[i].get_translation() - asteroids[j].get_translation() + asteroids[j].get_direction()).normalize()
+            asteroids[i].set_destruction_vector(d_vec1)
+            asteroids[i].set_destruction_speed(asteroids[j].get_speed())
+
+            asteroids[j].set_destroyed()
+            #asteroids[j].set_destruction_vector(asteroids[i].get_direction())
+            d_vec2 = (asteroids[j].get_translation() - asteroids[i].get_translation() + asteroids[i].get_direction()).normalize()
+            asteroids[j].set_destruction_vector(d_vec2)
+            asteroids[j].set_destruction_speed(asteroids[i].get_speed())
+
+        # do not check debris for collisions to save time every frame
+        # TODO: do a coarser collision test, e.g., spheres or bounding boxes?
+
+        if measure_phases:
+            t_collisions = time.perf_counter()
+
+        # handle events when an asteroid is destroyed
+        for a in asteroids:
+            if a.destroyed():
+                m_pos = a.get_translation()
+                radius = a.get_radius()
+                if publish_asteroids:
+                    events.publish(AsteroidDestroyed(self.frame, m_pos, radius, radius // 2 > 10))
+
+                # generate random debris particles within the radius of the old asteroid
+                for i in range(0, self.get_num_debris(radius)):
+                    current_radius = random.uniform(radius / 4, radius)
+                    current_direction = pygame.math.Vector2(0, 1)
+                    current_direction.rotate_ip(random.uniform(0, 360))
+                    current_pos = m_pos + current_radius * current_direction
+                    new_debris = Debris(current_pos, [ min(255, c + int(random.uniform(-15,15))) for c in a.get_color()] )
+                    move_dir = current_direction.rotate(random.uniform(-15,15)).normalize()
+                    new_debris.set_direction(move_dir)
+                    new_debris.set_speed((a.get_destruction_speed() + a.get_speed()) / random.uniform(2.5,3.5))
+                    debris_objects.append(new_debris)
+
+                # for large asteroids: create smaller asteroids
+                if radius // 2 > 10:
+                    new_num_verts = max(3, a.get_num_vertices() - 2)
+                    new_radius1 = radius // 2 + int(random.uniform(-4, 5))
+                    new_radius2 = radius // 2 + int(random.uniform(-4, 5))
+                    dist_axis = a.get_destruction_vector().normalize().rotate(90)
+                    pos1 = m_pos + dist_axis * (new_radius1 * 1.5)
+                    pos2 = m_pos - dist_axis * (new_radius2 * 1.5)
+                    dir1 = dist_axis.rotate(random.uniform(-30, 30))
+                    dir2 = dist_axis.rotate(180 + random.uniform(-30,30))
+
+                    a1 = Asteroid(new_radius1, new_num_verts,  [ c + min(255, int(random.uniform(-15,15))) for c in asteroid_color] )
+                    a2 = Asteroid(new_radius2, new_num_verts,  [ c + min(255, int(random.uniform(-15,15))) for c in asteroid_color] )
+
+                    a1.set_translation(pos1)
+                    a1.set_direction(dir1)
+                    a1.set_speed((a.get_destruction_speed() + a.get_speed()) / random.uniform(2,3))
+                    asteroids.append(a1)
+
+                    a2.set_translation(pos2)
+                    a2.set_direction(dir2)
+                    a2.set_speed((a.get_destruction_speed() + a.get_speed()) / random.uniform(2,3))
+                    asteroids.append(a2)
+
+        for s in fired_shots:
+            if s.destroyed():
+                # generate random debris particles
+                m_pos = s.get_translation()
+                radius = 5
+                for i in range(0, self.get_num_debris(radius)):
+                    current_radius = random.uniform(radius / 2, radius)
+                    current_direction = pygame.math.Vector2(0, 1)
+                    current_direction.rotate_ip(random.uniform(0, 360))
+                    current_pos = m_pos + current_radius * current_direction
+                    new_debris = Debris(current_pos, [ min(255, c + int(random.uniform(-15,15))) for c in s.get_color()] )
+                    move_dir = current_direction.rotate(random.uniform(-15,15)).normalize()
+                    new_debris.set_direction(move_dir)
+                    debris_objects.append(new_debris)
+
+        # handle events when player spaceship is destroyed
+        if spaceship.destroyed():
+            m_pos = spaceship.get_translation()
+            radius = 20
+            for i in range(0, self.get_num_debris(radius)):
+                current_radius = random.uniform(radius / 4, radius)
+                current_direction = pygame.math.Vector2(0, 1)
+                current_direction.rotate_ip(random.uniform(0, 360))
+                current_pos = m_pos + current_radius * current_direction
+                new_debris = Debris(current_pos, [ min(255, c + int(random.uniform(-15,15))) for c in spaceship.get_color()] )
+                move_dir = current_direction.rotate(random.uniform(-15,15)).normalize()
+                new_debris.set_direction(move_dir)
+                new_debris.set_speed((a.get_destruction_speed() + a.get_speed()) / random.uniform(2.5,3.5))
+                debris_objects.append(new_debris)
+
+            self.lifes = self.lifes - 1
+            self.spaceship_destroyed = True
+            if self.lifes < 1:
+                self.game_over = True
+
+            if events.has_subscribers(ShipLost):
+                events.publish(ShipLost(self.frame, m_pos, self.lifes, self.game_over))
+
+            self.spaceship = Spaceship(spaceship_color)
+            self.spaceship.set_translation(pygame.math.Vector2(screen_width//2,screen_height//2))
+
+        # remove destroyed objects
+        self.asteroids = [a for a in asteroids if not a.destroyed()]
+        self.fired_shots = [s for s in fired_shots if not s.destroyed() ]
+        self.debris_objects = [d for d in debris_objects if not d.destroyed() ]
+
+        if measure_phases:
+            t_end = time.perf_counter()
+            phase_times = [ ("movement", t_movement - t_start), ("collisions", t_collisions - t_movement),
+                    ("destruction", t_end - t_collisions) ]
+            events.publish(FrameFinished(self.frame, phase_times, self.get_num_objects(), self.points, self.level, self.lifes))
+
+    def render(self, surface):
+        # Draw objects
+        if not self.spaceship_destroyed:
+            self.spaceship.render_with_screen_wraps(surface)
+        for a in self.asteroids:
+            a.render_with_screen_wraps(surface)
+        for s in self.fired_shots:
+            s.render_with_screen_wraps(surface)
+        for d in self.debris_objects:
+            d.render_with_screen_wraps(surface)